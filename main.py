@@ -1,7 +1,9 @@
+import multiprocessing
 import tkinter as tk
 from tkinter import messagebox
 from utils.gui import create_gui
 from utils.launch_loading import show_loading_screen
+from utils.viewer_process import start_viewer_pool, shutdown_viewer_pool
 
 class Application:
     def __init__(self):
@@ -9,6 +11,7 @@ class Application:
         self.root.withdraw()  # Hide the main window initially
 
     def setup(self):
+        start_viewer_pool(self.root)  # Warm up a 3D viewer process while the loading screen is shown
         show_loading_screen()  # Show loading screen
 
         self.root.deiconify()  # Show the main window after loading screen
@@ -33,6 +36,7 @@ class Application:
 
     def on_closing(self):
         if messagebox.askokcancel("Exit", "Are you sure to exit?"):
+            shutdown_viewer_pool()
             self.root.destroy()
 
 def main():
@@ -41,4 +45,5 @@ def main():
     app.run()
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # Required for the viewer processes in PyInstaller builds
     main()
@@ -1,55 +1,315 @@
 import pandas as pd
 import numpy as np
 from PIL import Image
+import bz2
+import gzip
+import lzma
 import os
+import time
+import zipfile
 from tkinter import filedialog, messagebox, ttk
 import tkinter as tk
+from utils.image_processing import fill_holes
 
-def import_task(progress_label, progress_bar, filename, file_index, total_files):
+REQUIRED_COLUMNS = ['X', 'Y', 'Grayscale']
+SUPPORTED_EXTENSIONS = ('.csv', '.xlsx', '.parquet', '.feather', '.arrow', '.npy', '.npz')
+COMPRESSED_EXTENSIONS = ('.csv.gz', '.csv.bz2', '.csv.xz', '.csv.zst', '.zip')
+CHUNK_SIZE = 1_000_000  # Points drawn between two progress updates
+
+
+def check_columns(columns):
+    if not all(col in columns for col in REQUIRED_COLUMNS):
+        raise ValueError(
+            "The file must contain 'X', 'Y', and 'Grayscale' columns")
+
+
+def read_arrow_columns(filename):
+    try:
+        import pyarrow.feather as feather
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Reading Parquet/Feather files requires the 'pyarrow' package")
+
+    if filename.endswith('.parquet'):
+        table = pq.read_table(filename, memory_map=True)
+    else:
+        table = feather.read_table(filename, memory_map=True)
+    check_columns(table.column_names)
+
+    columns = []
+    for name in REQUIRED_COLUMNS:
+        column = table.column(name)
+        if column.num_chunks == 1:
+            # Zero-copy view when the column has no nulls, otherwise Arrow has to materialize it
+            columns.append(column.chunk(0).to_numpy(zero_copy_only=False))
+        else:
+            columns.append(column.to_numpy())
+    return columns
+
+
+def read_numpy_columns(filename):
+    if filename.endswith('.npz'):
+        # Members of an archive cannot be memory-mapped, each one is read once
+        with np.load(filename) as archive:
+            if all(name in archive.files for name in REQUIRED_COLUMNS):
+                return [archive[name] for name in REQUIRED_COLUMNS]
+            if len(archive.files) != 1:
+                raise ValueError(
+                    "The archive must contain 'X', 'Y' and 'Grayscale' arrays or a single point array")
+            points = archive[archive.files[0]]
+    else:
+        points = np.load(filename, mmap_mode='r')
+
+    if points.dtype.names is not None:
+        check_columns(points.dtype.names)
+        return [points[name] for name in REQUIRED_COLUMNS]
+    if points.ndim != 2 or points.shape[1] < 3:
+        raise ValueError("The point array must have shape (N, 3) with X, Y and Grayscale columns")
+    return [points[:, 0], points[:, 1], points[:, 2]]
+
+
+def read_points(filename):
+    """Return the X, Y and Grayscale columns of a data file as NumPy arrays"""
     if filename.endswith('.csv'):
         df = pd.read_csv(filename)
     elif filename.endswith('.xlsx'):
         df = pd.read_excel(filename)
+    elif filename.endswith(('.parquet', '.feather', '.arrow')):
+        return read_arrow_columns(filename)
+    elif filename.endswith(('.npy', '.npz')):
+        return read_numpy_columns(filename)
     else:
         raise ValueError("Unsupported file format")
 
-    required_columns = ['X', 'Y', 'Grayscale']
-    if not all(col in df.columns for col in required_columns):
-        raise ValueError(
-            "The file must contain 'X', 'Y', and 'Grayscale' columns")
+    check_columns(df.columns)
+    return [df[name].to_numpy() for name in REQUIRED_COLUMNS]
+
 
-    min_x, max_x = df['X'].min().astype(int), df['X'].max().astype(int)
-    min_y, max_y = df['Y'].min().astype(int), df['Y'].max().astype(int)
+def rasterize_points(x, y, gray, progress_callback=None):
+    if len(x) == 0:
+        raise ValueError("The file does not contain any points")
+
+    min_x, max_x = int(x.min()), int(x.max())
+    min_y, max_y = int(y.min()), int(y.max())
 
     img = np.zeros((max(max_y - min_y + 1, 1),
                    max(max_x - min_x + 1, 1)), dtype=np.uint8)
 
-    total_rows = len(df)
-    for index, row in df.iterrows():
-        x, y, gray = row['X'].astype(int), row['Y'].astype(
-            int), row['Grayscale'].astype(int)
-        img[max_y - y, x - min_x] = gray
+    # Draw in chunks so that only one chunk of integer indices is alive at a time,
+    # the source columns (possibly memory-mapped) are never copied as a whole
+    total_rows = len(x)
+    for start in range(0, total_rows, CHUNK_SIZE):
+        stop = min(start + CHUNK_SIZE, total_rows)
+        xs = x[start:stop].astype(int, copy=False)
+        ys = y[start:stop].astype(int, copy=False)
+        img[max_y - ys, xs - min_x] = gray[start:stop].astype(int, copy=False)
+
+        if progress_callback is not None:
+            progress_callback(stop, total_rows)
+
+    return img
+
+
+class IncrementalRaster:
+    """Grayscale raster that grows as more points are appended to it"""
+
+    def __init__(self):
+        self.img = None
+        self.min_x = None
+        self.max_y = None
+        self.num_points = 0
+
+    def add_points(self, x, y, gray):
+        x = np.asarray(x).astype(int)
+        y = np.asarray(y).astype(int)
+        gray = np.asarray(gray).astype(int)
+        if len(x) == 0:
+            return
+
+        min_x, max_x = x.min(), x.max()
+        min_y, max_y = y.min(), y.max()
+
+        if self.img is None:
+            self.min_x, self.max_y = min_x, max_y
+            self.img = np.zeros((max_y - min_y + 1, max_x - min_x + 1), dtype=np.uint8)
+        else:
+            height, width = self.img.shape
+            cur_max_x = self.min_x + width - 1
+            cur_min_y = self.max_y - height + 1
+            new_min_x, new_max_x = min(self.min_x, min_x), max(cur_max_x, max_x)
+            new_min_y, new_max_y = min(cur_min_y, min_y), max(self.max_y, max_y)
+
+            # Grow the canvas only when the new points fall outside the current bounds
+            if (new_min_x, new_max_x, new_min_y, new_max_y) != (self.min_x, cur_max_x, cur_min_y, self.max_y):
+                grown = np.zeros((new_max_y - new_min_y + 1, new_max_x - new_min_x + 1), dtype=np.uint8)
+                top, left = new_max_y - self.max_y, self.min_x - new_min_x
+                grown[top:top + height, left:left + width] = self.img
+                self.img = grown
+                self.min_x, self.max_y = new_min_x, new_max_y
+
+        self.img[self.max_y - y, x - self.min_x] = gray
+        self.num_points += len(x)
+
 
-        # Update progress
-        progress = (index + 1) / total_rows
-        progress_bar['value'] = progress * 100
+class TimedReader:
+    """File-like wrapper that measures the time spent reading (and decompressing) the stream"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.read_time = 0.0
+
+    def read(self, size=-1):
+        start = time.perf_counter()
+        data = self.stream.read(size)
+        self.read_time += time.perf_counter() - start
+        return data
+
+    def __iter__(self):
+        return iter(self.readline, b'')
+
+    def readline(self, size=-1):
+        start = time.perf_counter()
+        line = self.stream.readline(size)
+        self.read_time += time.perf_counter() - start
+        return line
+
+
+def open_compressed_stream(filename):
+    if filename.endswith('.gz'):
+        return gzip.open(filename, 'rb')
+    if filename.endswith('.bz2'):
+        return bz2.open(filename, 'rb')
+    if filename.endswith('.xz'):
+        return lzma.open(filename, 'rb')
+    if filename.endswith('.zst'):
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError("Reading .zst files requires the 'zstandard' package")
+        return zstandard.ZstdDecompressor().stream_reader(
+            open(filename, 'rb'), closefd=True, read_across_frames=True)  # pzstd and concatenated files have several frames
+    raise ValueError("Unsupported file format")
+
+
+def read_csv_stream(stream, progress_callback=None):
+    """
+    Parse a CSV stream chunk by chunk and draw the points as they arrive.
+    Returns the image, the number of points and the time spent reading,
+    parsing and drawing.
+    """
+    reader = TimedReader(stream)
+    raster = IncrementalRaster()
+    draw_time = 0.0
+
+    start = time.perf_counter()
+    for chunk in pd.read_csv(reader, chunksize=CHUNK_SIZE):
+        check_columns(chunk.columns)
+        draw_start = time.perf_counter()
+        raster.add_points(chunk['X'].to_numpy(), chunk['Y'].to_numpy(), chunk['Grayscale'].to_numpy())
+        draw_time += time.perf_counter() - draw_start
+
+        if progress_callback is not None:
+            progress_callback(raster.num_points)
+    total_time = time.perf_counter() - start
+
+    if raster.img is None:
+        raise ValueError("The file does not contain any points")
+    timings = {'read': reader.read_time, 'parse': total_time - reader.read_time - draw_time, 'draw': draw_time}
+    return raster.img, raster.num_points, timings
+
+
+def is_csv_member(name):
+    """CSV entries of an archive, without folders and macOS metadata such as __MACOSX/._scan.csv"""
+    basename = name.rsplit('/', 1)[-1]
+    if name.startswith('__MACOSX/') or basename.startswith('.'):
+        return False
+    return basename.lower().endswith('.csv')
+
+
+def import_compressed_task(progress_label, progress_bar, filename, file_index, total_files):
+    """
+    Import a compressed CSV or every CSV of a zip archive, one image per CSV.
+    Images are named after the file, or the member's path inside the archive.
+    """
+    if filename.endswith('.zip'):
+        archive = zipfile.ZipFile(filename)
+        members = [name for name in archive.namelist() if is_csv_member(name)]
+        if not members:
+            archive.close()
+            raise ValueError(f"The archive '{os.path.basename(filename)}' does not contain any CSV files")
+        sources = [(name, lambda name=name: archive.open(name)) for name in members]
+    else:
+        archive = None
+        sources = [(os.path.basename(filename), lambda: open_compressed_stream(filename))]
+
+    results = []
+    try:
+        for member_index, (name, open_member) in enumerate(sources, 1):
+            member_label = f"{name} ({member_index}/{len(sources)})" if archive else name
+
+            def update_progress(done_rows):
+                progress_label.config(
+                    text=f"Processing file {file_index}/{total_files}: {member_label}, point {done_rows}")
+                progress_label.update()
+
+            progress_bar['value'] = (member_index - 1) / len(sources) * 100
+            with open_member() as stream:
+                img, num_points, timings = read_csv_stream(stream, update_progress)
+
+            results.append((name, img, num_points, timings))
+    finally:
+        if archive is not None:
+            archive.close()
+    return results
+
+
+def import_task(progress_label, progress_bar, filename, file_index, total_files):
+    x, y, gray = read_points(filename)
+
+    def update_progress(done_rows, total_rows):
+        progress_bar['value'] = done_rows / total_rows * 100
         progress_label.config(
-            text=f"Processing file {file_index}/{total_files}, point {index + 1}/{total_rows}")
+            text=f"Processing file {file_index}/{total_files}, point {done_rows}/{total_rows}")
         progress_label.update()
 
-    return img, total_rows  # Return the image and the number of points
+    img = rasterize_points(x, y, gray, update_progress)
+    return img, len(x)  # Return the image and the number of points
+
+def hole_filling_enabled(root):
+    fill_enabled = getattr(root, 'fill_holes', None)
+    return fill_enabled is not None and fill_enabled.get()
+
+def get_max_fill_distance(root):
+    try:
+        max_distance = root.max_fill_distance.get()
+    except tk.TclError:
+        max_distance = None
+    if max_distance is None or not 1 <= max_distance <= 100:
+        raise ValueError("The gap filling distance must be a whole number between 1 and 100")
+    return max_distance
+
+def apply_hole_filling(root, img):
+    """Fill empty pixels if enabled in the main window, the result is used for both 2D and 3D"""
+    if not hole_filling_enabled(root):
+        return img
+    return fill_holes(img, max_distance=get_max_fill_distance(root))
 
 def import_and_draw_images(root):
     filenames = filedialog.askopenfilenames(
         title="Select data files",
-        filetypes=(("Excel files", "*.xlsx *.xls"),
-                   ("CSV files", "*.csv"), ("All files", "*.*")),
+        filetypes=(("All supported files", "*.csv *.xlsx *.parquet *.feather *.arrow *.npy *.npz "
+                                            "*.csv.gz *.csv.bz2 *.csv.xz *.csv.zst *.zip"),
+                   ("Excel files", "*.xlsx *.xls"), ("CSV files", "*.csv"),
+                   ("Compressed CSV files", "*.csv.gz *.csv.bz2 *.csv.xz *.csv.zst *.zip"),
+                   ("Arrow files", "*.parquet *.feather *.arrow"),
+                   ("NumPy arrays", "*.npy *.npz"), ("All files", "*.*")),
     )
     if not filenames:
         return
 
     try:
         images = []
+        timing_report = []  # Filled for compressed inputs, where decompression can dominate
         total_files = len(filenames)
                 
         # Create a progress dialog
@@ -80,9 +340,9 @@ def import_and_draw_images(root):
         progress_bar.pack(pady=5)
 
         for i, filename in enumerate(filenames, 1):
-            if not (filename.endswith('.csv') or filename.endswith('.xlsx')):
+            if not filename.endswith(SUPPORTED_EXTENSIONS + COMPRESSED_EXTENSIONS):
                 messagebox.showerror(
-                    "Invalid File Format", f"The file '{os.path.basename(filename)}' is not a supported format. Please select CSV or Excel files only.")
+                    "Invalid File Format", f"The file '{os.path.basename(filename)}' is not a supported format. Please select CSV (optionally compressed or zipped), Excel, Parquet, Feather or NumPy files only.")
                 progress_window.destroy()
                 return
             
@@ -90,14 +350,37 @@ def import_and_draw_images(root):
             progress_bar['value'] = (i / total_files) * 100
             progress_window.update()
 
-            imported_img, num_points = import_task(progress_label, progress_bar, filename, i, total_files)
-            base_filename = os.path.splitext(os.path.basename(filename))[0]
-            new_filename = f"{base_filename} ({num_points} points)"
-            images.append((imported_img, new_filename))
+            if filename.endswith(COMPRESSED_EXTENSIONS):
+                imported = []
+                for name, img, num_points, timings in import_compressed_task(
+                        progress_label, progress_bar, filename, i, total_files):
+                    imported.append((name, img, num_points))
+                    timing_report.append(
+                        f"{name}: read/decompress {timings['read']:.2f}s, "
+                        f"parse {timings['parse']:.2f}s, draw {timings['draw']:.2f}s")
+            else:
+                imported_img, num_points = import_task(progress_label, progress_bar, filename, i, total_files)
+                imported = [(os.path.basename(filename), imported_img, num_points)]
+
+            if hole_filling_enabled(root):
+                progress_label.config(text=f"Filling gaps in file {i}/{total_files}")
+                progress_label.update()
+            for name, imported_img, num_points in imported:
+                imported_img = apply_hole_filling(root, imported_img)
+                # Archive members keep their relative path so equal names in different folders stay apart
+                base_filename = name
+                for extension in COMPRESSED_EXTENSIONS + SUPPORTED_EXTENSIONS:
+                    if base_filename.lower().endswith(extension):
+                        base_filename = base_filename[:-len(extension)]
+                        break
+                new_filename = f"{base_filename} ({num_points} points)"
+                images.append((imported_img, new_filename))
 
         progress_window.destroy()
         from utils.gui import show_images  # Import here to avoid circular import
         show_images(root, images)
+        if timing_report:
+            messagebox.showinfo("Import Timings", "\n".join(timing_report))
     except Exception as e:
         messagebox.showerror("Error", f"Failed to import data: {str(e)}")
 
@@ -1,17 +1,44 @@
 import tkinter as tk
-from tkinter import filedialog, ttk
+from tkinter import filedialog, messagebox, ttk
+import numpy as np
 from PIL import Image, ImageTk
 from utils.file_operations import import_and_draw_images, save_image
-from utils.plotting import show_3d_plot
+from utils.image_processing import StackStatistics
+from utils.memory_manager import image_store
+from utils.viewer_process import open_3d_viewer
+from utils.watch_folder import toggle_watch_folder
+from utils.zoom_viewer import show_zoom_viewer
 import time
 
-def create_gui(root):
-    import_button = tk.Button(root, text="Import Data", command=lambda: import_and_draw_images(root))
-    import_button.pack(pady=20)
+PREVIEW_SIZE = 1024  # Longest side of the copy kept per tile for thumbnails
 
+def create_gui(root):
+    # The image frame is created first so that it keeps the '.!frame' name
     image_frame = tk.Frame(root)
+    button_frame = tk.Frame(root)
+    button_frame.pack(pady=20)
     image_frame.pack(padx=10, pady=10, fill=tk.BOTH, expand=True)
 
+    import_button = tk.Button(button_frame, text="Import Data", command=lambda: import_and_draw_images(root))
+    import_button.pack(side=tk.LEFT, padx=5)
+
+    watch_button = tk.Button(button_frame, text="Watch Folder", command=lambda: toggle_watch_folder(root, watch_button))
+    watch_button.pack(side=tk.LEFT, padx=5)
+
+    stats_button = tk.Button(button_frame, text="Stack Statistics", command=lambda: show_stack_statistics(root))
+    stats_button.pack(side=tk.LEFT, padx=5)
+
+    # Gap filling options, applied to newly imported images
+    root.fill_holes = tk.BooleanVar(value=False)
+    root.max_fill_distance = tk.IntVar(value=5)
+    fill_check = tk.Checkbutton(button_frame, text="Fill gaps up to", variable=root.fill_holes)
+    fill_check.pack(side=tk.LEFT, padx=(15, 0))
+    only_digits = root.register(lambda text: text.isdigit() or text == "")
+    fill_spinbox = tk.Spinbox(button_frame, from_=1, to=100, width=4, textvariable=root.max_fill_distance,
+                              validate='key', validatecommand=(only_digits, '%P'))
+    fill_spinbox.pack(side=tk.LEFT)
+    tk.Label(button_frame, text="px").pack(side=tk.LEFT)
+
     # Display initial message
     initial_message = tk.Label(image_frame, text="Please upload data to display images", font=("Arial", 16))
     initial_message.pack(expand=True)
@@ -24,6 +51,8 @@ def create_gui(root):
 def show_images(root, images):
     image_frame = root.nametowidget('.!frame')
     for widget in image_frame.winfo_children():
+        if hasattr(widget, 'image_label'):
+            release_tile(widget)
         widget.destroy()
 
     if not images:
@@ -31,84 +60,191 @@ def show_images(root, images):
         message_label.pack(expand=True)
         return
 
-    num_images = len(images)
-    
+    for img, filename in images:
+        create_image_tile(image_frame, img, filename)
+    layout_image_tiles(image_frame)
+
+    # Initial update of images
+    update_root_images(root)
+
+def add_images(root, images, derived=False):
+    """Append tiles to the gallery without rebuilding the existing ones"""
+    image_frame = root.nametowidget('.!frame')
+    # Drop the placeholder message if nothing has been displayed yet
+    for widget in image_frame.winfo_children():
+        if not hasattr(widget, 'image_label'):
+            widget.destroy()
+
+    tiles = [create_image_tile(image_frame, img, filename, derived) for img, filename in images]
+    layout_image_tiles(image_frame)
+    update_root_images(root)
+    return tiles
+
+def get_gallery_tiles(root, include_derived=False):
+    """Tiles of the gallery, computed results are skipped unless asked for"""
+    image_frame = root.nametowidget('.!frame')
+    return [widget for widget in image_frame.winfo_children()
+            if hasattr(widget, 'image_label') and (include_derived or not widget.derived)]
+
+def show_stack_statistics(root):
+    tiles = get_gallery_tiles(root)
+    if len(tiles) < 2:
+        messagebox.showwarning("Stack Statistics", "Please load at least two images of the same size.")
+        return
+
+    dialog = tk.Toplevel(root)
+    dialog.title("Stack Statistics")
+    dialog.resizable(False, False)
+
+    # Pre-select the images sharing the most common size, the user can change the selection
+    shapes = [image_store.shape(tile.image_label.image_handle) for tile in tiles]
+    common_shape = max(set(shapes), key=shapes.count)
+
+    tk.Label(dialog, text="Images in the stack:").pack(padx=10, pady=(10, 5), anchor='w')
+    selected = []
+    for tile, shape in zip(tiles, shapes):
+        var = tk.BooleanVar(value=shape == common_shape)
+        tk.Checkbutton(dialog, text=f"{tile.filename}  [{shape[1]}x{shape[0]}]", variable=var, anchor='w').pack(
+            padx=10, fill=tk.X)
+        selected.append(var)
+
+    tk.Label(dialog, text="Reference image:").pack(padx=10, pady=(10, 5), anchor='w')
+    names = [tile.filename for tile in tiles]
+    reference_box = ttk.Combobox(dialog, values=names, state='readonly', width=40)
+    reference_box.current(shapes.index(common_shape))
+    reference_box.pack(padx=10, pady=5)
+
+    def compute():
+        # Watched files may have been updated while the dialog was open, read the tiles' current state
+        if not all(tile.winfo_exists() for tile in tiles):
+            messagebox.showerror("Stack Statistics", "The gallery changed, please open the dialog again.", parent=dialog)
+            dialog.destroy()
+            return
+        handles = [tile.image_label.image_handle for tile in tiles]
+        current_shapes = [image_store.shape(handle) for handle in handles]
+
+        stack = [(handle, shape) for handle, shape, var in zip(handles, current_shapes, selected) if var.get()]
+        reference_index = reference_box.current()
+        reference_handle, reference_name = handles[reference_index], tiles[reference_index].filename
+
+        if len(stack) < 2:
+            messagebox.showwarning("Stack Statistics", "Please select at least two images.", parent=dialog)
+            return
+        stack_shape = stack[0][1]
+        if any(shape != stack_shape for _, shape in stack) or current_shapes[reference_index] != stack_shape:
+            messagebox.showerror("Stack Statistics",
+                                 "The selected images and the reference must all have the same size.", parent=dialog)
+            return
+        dialog.destroy()
+
+        # Images are fetched one at a time so spilled ones do not all come back at once
+        stats = StackStatistics()
+        for handle, _ in stack:
+            stats.add(image_store.get(handle))
+
+        # Keep the results in grayscale units so they can be displayed and saved like any other image
+        def to_uint8(values):
+            return np.clip(np.rint(values), 0, 255).astype(np.uint8)
+
+        count = len(stack)
+        add_images(root, [
+            (to_uint8(stats.mean), f"Mean of {count} images"),
+            (to_uint8(stats.std()), f"Std of {count} images"),
+            (stats.min, f"Min of {count} images"),
+            (stats.max, f"Max of {count} images"),
+            (to_uint8(stats.difference(image_store.get(reference_handle))), f"|Mean - {reference_name}|"),
+        ], derived=True)
+
+    ttk.Button(dialog, text="Compute", command=compute).pack(pady=10)
+    dialog.grab_set()
+
+def create_image_tile(image_frame, img, filename, derived=False):
+    frame = tk.Frame(image_frame, borderwidth=1, relief="solid")
+    frame.derived = derived  # Computed from other tiles, e.g. stack statistics
+
+    container = tk.Frame(frame)
+    container.pack(expand=True, fill=tk.BOTH)
+
+    # Create a header frame for filename and buttons
+    header_frame = tk.Frame(container)
+    header_frame.pack(side=tk.TOP, fill=tk.X)
+    header_frame.grid_columnconfigure(0, weight=1)  # Make filename column expandable
+
+    # Add filename to the left
+    frame.filename_label = tk.Label(header_frame, bg='white', fg='black', anchor='w')
+    frame.filename_label.grid(row=0, column=0, sticky='ew')
+
+    # Add buttons to the right
+    frame.zoom_button = tk.Button(header_frame, text="Zoom View", width=10)
+    frame.zoom_button.grid(row=0, column=1, padx=(0, 5))
+
+    frame.show_3d_button = tk.Button(header_frame, text="3D Model", width=10)
+    frame.show_3d_button.grid(row=0, column=2, padx=(0, 5))
+
+    frame.save_button = tk.Button(header_frame, text="Save Image", width=10)
+    frame.save_button.grid(row=0, column=3, padx=(0, 5))
+
+    # Image label
+    frame.image_label = tk.Label(container)
+    frame.image_label.pack(expand=True, fill=tk.BOTH)
+
+    set_tile_image(frame, img, filename)
+    return frame
+
+def set_tile_image(frame, img, filename):
+    """Point an existing tile at a new array, the thumbnail is redrawn on the next update"""
+    # Tiles only hold a handle, the array itself is owned by the image store
+    image_label = frame.image_label
+    if hasattr(image_label, 'image_handle'):
+        handle = image_label.image_handle
+        image_store.replace(handle, img)
+    else:
+        handle = image_store.add(img)
+    frame.filename = filename
+    frame.filename_label.configure(text=filename)
+    frame.zoom_button.configure(command=lambda handle=handle, filename=filename: show_zoom_viewer(frame.winfo_toplevel(), image_store.get(handle), filename))
+    frame.show_3d_button.configure(command=lambda handle=handle, filename=filename: open_3d_viewer(image_store.get(handle), filename))
+    frame.save_button.configure(command=lambda handle=handle, filename=filename: save_image(image_store.get(handle), filename))
+
+    # A bounded copy for thumbnails, so resizing the window never reloads spilled arrays
+    preview = Image.fromarray(img)
+    preview.thumbnail((PREVIEW_SIZE, PREVIEW_SIZE), Image.LANCZOS)
+
+    image_label.image_handle = handle
+    image_label.preview = preview
+    image_label.filename = filename
+    if hasattr(image_label, 'current_size'):
+        del image_label.current_size  # Force the thumbnail to be regenerated
+
+def release_tile(frame):
+    image_label = frame.image_label
+    if hasattr(image_label, 'image_handle'):
+        image_store.release(image_label.image_handle)
+        del image_label.image_handle
+
+def layout_image_tiles(image_frame):
+    tiles = [widget for widget in image_frame.winfo_children() if hasattr(widget, 'image_label')]
+    num_images = len(tiles)
+
     if num_images == 1:
         # For a single image, use pack to center it
-        frame = tk.Frame(image_frame, borderwidth=1, relief="solid")
-        frame.pack(expand=True, padx=10, pady=10)
-        
-        container = tk.Frame(frame)
-        container.pack(expand=True, fill=tk.BOTH)
-        
-        # Create a header frame for filename and buttons
-        header_frame = tk.Frame(container)
-        header_frame.pack(side=tk.TOP, fill=tk.X)
-        header_frame.grid_columnconfigure(0, weight=1)  # Make filename column expandable
-        
-        img, filename = images[0]
-        
-        # Add filename to the left
-        filename_label = tk.Label(header_frame, text=filename, bg='white', fg='black', anchor='w')
-        filename_label.grid(row=0, column=0, sticky='ew')
-        
-        # Add buttons to the right
-        show_3d_button = tk.Button(header_frame, text="3D Model", command=lambda img=img, filename=filename: show_3d_plot(img, filename), width=10)
-        show_3d_button.grid(row=0, column=1, padx=(0, 5))
-        
-        save_button = tk.Button(header_frame, text="Save Image",
-                                command=lambda img=img, filename=filename: save_image(img, filename), width=10)
-        save_button.grid(row=0, column=2, padx=(0, 5))
-        
-        # Image label
-        image_label = tk.Label(container)
-        image_label.pack(expand=True, fill=tk.BOTH)
-        image_label.original_image = Image.fromarray(img)
-        image_label.filename = filename
-    else:
+        tiles[0].grid_forget()
+        tiles[0].pack(expand=True, padx=10, pady=10)
+    elif num_images > 1:
         # For multiple images, use grid layout
         num_cols = min(3, num_images)
         num_rows = (num_images + num_cols - 1) // num_cols
 
-        for i, (img, filename) in enumerate(images):
-            frame = tk.Frame(image_frame, borderwidth=1, relief="solid")
+        for i, frame in enumerate(tiles):
+            frame.pack_forget()
             frame.grid(row=i//num_cols, column=i % num_cols, padx=10, pady=10, sticky="nsew")
 
-            container = tk.Frame(frame)
-            container.pack(expand=True, fill=tk.BOTH)
-
-            # Create a header frame for filename and buttons
-            header_frame = tk.Frame(container)
-            header_frame.pack(side=tk.TOP, fill=tk.X)
-            header_frame.grid_columnconfigure(0, weight=1)  # Make filename column expandable
-            
-            # Add filename to the left
-            filename_label = tk.Label(header_frame, text=filename, bg='white', fg='black', anchor='w')
-            filename_label.grid(row=0, column=0, sticky='ew')
-            
-            # Add buttons to the right
-            show_3d_button = tk.Button(header_frame, text="3D Model", command=lambda img=img, filename=filename: show_3d_plot(img, filename), width=10)
-            show_3d_button.grid(row=0, column=1, padx=(0, 5))
-            
-            save_button = tk.Button(header_frame, text="Save Image",
-                                    command=lambda img=img, filename=filename: save_image(img, filename), width=10)
-            save_button.grid(row=0, column=2, padx=(0, 5))
-
-            # Image label
-            image_label = tk.Label(container)
-            image_label.pack(expand=True, fill=tk.BOTH)
-            image_label.original_image = Image.fromarray(img)
-            image_label.filename = filename
-
         # Configure grid to expand with window
         for i in range(num_cols):
             image_frame.grid_columnconfigure(i, weight=1)
         for i in range(num_rows):
             image_frame.grid_rowconfigure(i, weight=1)
 
-    # Initial update of images
-    update_root_images(root)
-
 def update_root_images(root):
     image_frame = root.nametowidget('.!frame')
     frame_width = image_frame.winfo_width()
@@ -128,23 +264,7 @@ def update_root_images(root):
             return  # Skip if the container doesn't have enough children
         image_label = container.winfo_children()[-1]  # The last child is now the image label
         
-        if hasattr(image_label, 'original_image'):
-            pil_img = image_label.original_image.copy()
-            
-            # Calculate the scaling factor to fit within the available space while maintaining aspect ratio
-            width_ratio = (frame_width - 20) / pil_img.width
-            height_ratio = (frame_height - 40) / pil_img.height
-            scale_factor = min(width_ratio, height_ratio)
-            
-            new_size = (int(pil_img.width * scale_factor), int(pil_img.height * scale_factor))
-            
-            if not hasattr(image_label, 'current_size') or image_label.current_size != new_size:
-                pil_img = pil_img.resize(new_size, Image.LANCZOS)
-                tk_img = ImageTk.PhotoImage(pil_img)
-                
-                image_label.configure(image=tk_img)
-                image_label.image = tk_img  # Keep a reference
-                image_label.current_size = new_size
+        update_thumbnail(image_label, frame_width - 20, frame_height - 40)
     else:
         num_cols = min(3, num_images)
         num_rows = (num_images + num_cols - 1) // num_cols
@@ -161,23 +281,28 @@ def update_root_images(root):
                     continue  # Skip if the container doesn't have enough children
                 image_label = container.winfo_children()[-1]  # The last child is now the image label
                 
-                if hasattr(image_label, 'original_image'):
-                    pil_img = image_label.original_image.copy()
-                    
-                    # Calculate the scaling factor to fit within the available space while maintaining aspect ratio
-                    width_ratio = max_img_width / pil_img.width
-                    height_ratio = max_img_height / pil_img.height
-                    scale_factor = min(width_ratio, height_ratio)
-
-                    new_size = (int(pil_img.width * scale_factor), int(pil_img.height * scale_factor))
-                    
-                    if not hasattr(image_label, 'current_size') or image_label.current_size != new_size:
-                        pil_img = pil_img.resize(new_size, Image.LANCZOS)
-                        tk_img = ImageTk.PhotoImage(pil_img)
-                        
-                        image_label.configure(image=tk_img)
-                        image_label.image = tk_img  # Keep a reference
-                        image_label.current_size = new_size
+                update_thumbnail(image_label, max_img_width, max_img_height)
+
+def update_thumbnail(image_label, max_width, max_height):
+    if not hasattr(image_label, 'image_handle'):
+        return
+
+    height, width = image_store.shape(image_label.image_handle)[:2]
+
+    # Calculate the scaling factor to fit within the available space while maintaining aspect ratio
+    width_ratio = max_width / width
+    height_ratio = max_height / height
+    scale_factor = min(width_ratio, height_ratio)
+
+    new_size = (max(int(width * scale_factor), 1), max(int(height * scale_factor), 1))
+
+    if not hasattr(image_label, 'current_size') or image_label.current_size != new_size:
+        pil_img = image_label.preview.resize(new_size, Image.LANCZOS)
+        tk_img = ImageTk.PhotoImage(pil_img)
+
+        image_label.configure(image=tk_img)
+        image_label.image = tk_img  # Keep a reference
+        image_label.current_size = new_size
 
 # Debounce mechanism
 last_update_time = 0
@@ -1,4 +1,5 @@
 import numpy as np
+from scipy.ndimage import distance_transform_edt
 
 
 class GaussianFilter:
@@ -15,6 +16,188 @@ class GaussianFilter:
         """Apply Gaussian filter to the input image"""
         return np.convolve(input.flatten(), self.kernel.flatten(), mode='same').reshape(input.shape)
 
+    def apply_inplace(self, input, block_size=None):
+        """
+        Same result as apply(), written back into a C-contiguous input.
+        The flattened signal is convolved in blocks of block_size elements;
+        only the original values overlapping the previous block are kept aside.
+        """
+        flat = input.reshape(-1)
+        kernel = self.kernel.flatten()
+        half = (len(kernel) - 1) // 2
+        n = len(flat)
+        block_size = max(block_size or n, half + 1)
+
+        previous = np.zeros(half, dtype=flat.dtype)  # Original values left of the block (zero padded)
+        for start in range(0, n, block_size):
+            stop = min(start + block_size, n)
+            right = flat[stop:stop + half]
+            padding = np.zeros(half - len(right), dtype=flat.dtype)
+            signal = np.concatenate([previous, flat[start:stop], right, padding])
+            previous = flat[stop - half:stop].copy()
+            flat[start:stop] = np.convolve(signal, kernel, mode='valid')
+        return input
+
+
+class PreprocessingStep:
+    """
+    A step of a PreprocessingPipeline, modifying the float32 buffer Z in place.
+    Pointwise steps are applied to row blocks of the buffer and prepare() runs
+    once on the whole buffer before the blocks are processed. Other steps get
+    the whole buffer and the pipeline's block_rows (None for no blocking) so
+    they can process it in blocks themselves.
+    """
+    pointwise = True
+
+    def prepare(self, Z):
+        pass
+
+    def apply(self, Z, block_rows=None):
+        raise NotImplementedError
+
+
+class Normalize(PreprocessingStep):
+    """Scale to [0, 1], a flat image becomes all zeros instead of dividing by zero"""
+
+    def prepare(self, Z):
+        self.low = float(Z.min())
+        value_range = float(Z.max()) - self.low
+        self.scale = 1.0 / value_range if value_range > 0 else 0.0
+
+    def apply(self, Z, block_rows=None):
+        Z -= self.low
+        Z *= self.scale
+
+
+class Invert(PreprocessingStep):
+    def apply(self, Z, block_rows=None):
+        np.subtract(1, Z, out=Z)
+
+
+class Sqrt(PreprocessingStep):
+    def apply(self, Z, block_rows=None):
+        np.sqrt(Z, out=Z)  # faster than np.power(Z, 0.5)
+
+
+class Smooth(PreprocessingStep):
+    pointwise = False
+
+    def __init__(self, sigma=1):
+        self.filter = GaussianFilter(sigma=sigma)
+
+    def apply(self, Z, block_rows=None):
+        self.filter.apply_inplace(Z, block_size=block_rows * Z.shape[1] if block_rows else None)
+
+
+class PreprocessingPipeline:
+    """
+    Run preprocessing steps in place on a single float32 copy of the image.
+    Consecutive pointwise steps are fused per row block, so with block_rows
+    set each block is traversed once while it is still in cache.
+    """
+
+    def __init__(self, steps=None, block_rows=None):
+        self.steps = steps if steps is not None else [Normalize(), Invert(), Sqrt(), Smooth(sigma=1)]
+        self.block_rows = block_rows
+
+    def run(self, img):
+        Z = np.array(img, dtype=np.float32, order='C')  # The only full-size allocation
+        block_rows = self.block_rows or max(Z.shape[0], 1)
+
+        stage = []
+        for step in self.steps + [None]:
+            # A step that needs whole-buffer information starts a new fused stage
+            if step is None or not step.pointwise or type(step).prepare is not PreprocessingStep.prepare:
+                self.run_stage(Z, stage, block_rows)
+                stage = []
+            if step is None:
+                break
+            if step.pointwise:
+                step.prepare(Z)
+                stage.append(step)
+            else:
+                step.apply(Z, block_rows=self.block_rows)
+        return Z
+
+    def run_stage(self, Z, stage, block_rows):
+        if not stage:
+            return
+        for start in range(0, Z.shape[0], block_rows):
+            block = Z[start:start + block_rows]
+            for step in stage:
+                step.apply(block)
+
 # 使用示例：
 # gaussian_filter = GaussianFilter(sigma=1.5)
 # filtered_image = gaussian_filter.apply(input_image)
+
+
+class StackStatistics:
+    """
+    Per-pixel statistics over a stack of equally sized uint8 rasters, computed
+    in a single streaming pass with Welford updates. Only the running mean and
+    sum of squared deviations are kept in float32, the images themselves are
+    never stacked.
+    """
+
+    def __init__(self, block_rows=256):
+        self.block_rows = block_rows
+        self.count = 0
+        self.mean = None
+        self.m2 = None
+        self.min = None
+        self.max = None
+
+    def add(self, img):
+        if self.mean is None:
+            self.mean = np.zeros(img.shape, dtype=np.float32)
+            self.m2 = np.zeros(img.shape, dtype=np.float32)
+            self.min = img.copy()
+            self.max = img.copy()
+        elif img.shape != self.mean.shape:
+            raise ValueError(f"Image size {img.shape} does not match the stack size {self.mean.shape}")
+
+        self.count += 1
+        # Update in row blocks so the float32 temporaries stay small
+        for start in range(0, img.shape[0], self.block_rows):
+            rows = slice(start, start + self.block_rows)
+            x = img[rows].astype(np.float32)
+            mean = self.mean[rows]
+            delta = x - mean
+            mean += delta / self.count
+            x -= mean
+            x *= delta
+            self.m2[rows] += x
+        np.minimum(self.min, img, out=self.min)
+        np.maximum(self.max, img, out=self.max)
+
+    def std(self):
+        return np.sqrt(self.m2 / self.count)
+
+    def difference(self, reference):
+        """Absolute difference between the stack mean and a reference image"""
+        return np.abs(self.mean - reference.astype(np.float32))
+
+
+def fill_holes(img, max_distance=5, block_rows=1024):
+    """
+    Fill empty (zero) pixels with the value of the nearest non-empty pixel,
+    as long as it lies within max_distance pixels (exact Euclidean distance).
+    """
+    empty = img == 0
+    if not empty.any() or empty.all() or max_distance <= 0:
+        return img.copy()
+
+    # Only the nearest feature indices are requested, the distances are derived
+    # block by block to avoid a full float64 distance map
+    nearest_y, nearest_x = distance_transform_edt(empty, return_distances=False, return_indices=True)
+    filled = img.copy()
+    max_distance_sq = max_distance * max_distance
+    cols = np.arange(img.shape[1])
+    for start in range(0, img.shape[0], block_rows):
+        stop = min(start + block_rows, img.shape[0])
+        rows = np.arange(start, stop)[:, None]
+        block_y, block_x = nearest_y[start:stop], nearest_x[start:stop]
+        near = empty[start:stop] & ((block_y - rows) ** 2 + (block_x - cols) ** 2 <= max_distance_sq)
+        filled[start:stop][near] = img[block_y[near], block_x[near]]
+    return filled
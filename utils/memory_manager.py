@@ -0,0 +1,111 @@
+import atexit
+import itertools
+import os
+import shutil
+import tempfile
+from collections import OrderedDict
+import numpy as np
+
+# Budget for image arrays kept in RAM, can be overridden with an environment variable
+DEFAULT_BUDGET_MB = 1024
+
+
+def budget_from_environment():
+    try:
+        budget_mb = int(os.environ.get('POINTS2IMAGE_MEMORY_BUDGET_MB', DEFAULT_BUDGET_MB))
+    except ValueError:
+        budget_mb = DEFAULT_BUDGET_MB  # A malformed value must not keep the app from starting
+    return max(budget_mb, 0) * 1024 * 1024
+
+
+class ImageStore:
+    """
+    Keep track of the bytes held by loaded images. When the total exceeds the
+    budget, the least recently used arrays are spilled to a temporary
+    directory and transparently loaded back by get().
+    """
+
+    def __init__(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self.resident = OrderedDict()  # handle -> array, least recently used first
+        self.resident_bytes = 0
+        self.shapes = {}
+        self.spilled = {}  # handle -> .npy path, kept after reloading so a second spill is free
+        self._handles = itertools.count()
+        self._spill_dir = None
+
+    def add(self, img):
+        handle = next(self._handles)
+        self.resident[handle] = img
+        self.resident_bytes += img.nbytes
+        self.shapes[handle] = img.shape
+        self.enforce_budget(keep=handle)
+        return handle
+
+    def replace(self, handle, img):
+        """Point an existing handle at a new array, keeping its identity for other holders"""
+        old = self.resident.pop(handle, None)
+        if old is not None:
+            self.resident_bytes -= old.nbytes
+        path = self.spilled.pop(handle, None)
+        if path is not None and os.path.exists(path):
+            os.remove(path)  # The spilled copy holds the previous array
+        self.resident[handle] = img
+        self.resident_bytes += img.nbytes
+        self.shapes[handle] = img.shape
+        self.enforce_budget(keep=handle)
+
+    def get(self, handle):
+        img = self.resident.get(handle)
+        if img is None:
+            img = np.load(self.spilled[handle])
+            self.resident[handle] = img
+            self.resident_bytes += img.nbytes
+        self.resident.move_to_end(handle)
+        self.enforce_budget(keep=handle)
+        return img
+
+    def shape(self, handle):
+        return self.shapes[handle]
+
+    def release(self, handle):
+        img = self.resident.pop(handle, None)
+        if img is not None:
+            self.resident_bytes -= img.nbytes
+        path = self.spilled.pop(handle, None)
+        if path is not None and os.path.exists(path):
+            os.remove(path)
+        self.shapes.pop(handle, None)
+
+    def set_budget(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self.enforce_budget()
+
+    def enforce_budget(self, keep=None):
+        while self.resident_bytes > self.budget_bytes and self.resident:
+            handle = next(iter(self.resident))
+            if handle == keep:
+                break  # The image being used always stays in memory
+            img = self.resident.pop(handle)
+            self.resident_bytes -= img.nbytes
+            if handle not in self.spilled:
+                self.spilled[handle] = self.spill_path(handle)
+                np.save(self.spilled[handle], img)
+
+    def spill_path(self, handle):
+        if self._spill_dir is None:
+            self._spill_dir = tempfile.mkdtemp(prefix='points2image_')
+        return os.path.join(self._spill_dir, f"{handle}.npy")
+
+    def close(self):
+        if self._spill_dir is not None:
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
+            self._spill_dir = None
+        self.resident.clear()
+        self.resident_bytes = 0
+        self.spilled.clear()
+        self.shapes.clear()
+
+
+image_store = ImageStore(budget_from_environment())
+atexit.register(image_store.close)
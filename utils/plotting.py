@@ -4,13 +4,15 @@ import matplotlib.pyplot as plt
 import tkinter as tk
 from tkinter import ttk
 from tkinter import colorchooser
-from utils.image_processing import GaussianFilter
+from tkinter import messagebox
+from utils.image_processing import PreprocessingPipeline
 import random
 
 
 class Plot3D:
-    def __init__(self, img, filename, theme='document'):
+    def __init__(self, img, filename, theme='document', pipeline=None):
         self.img = img
+        self.pipeline = pipeline if pipeline is not None else PreprocessingPipeline(block_rows=512)
         self.filename = filename
         self.themes = [pv.themes.Theme(), pv.themes.DocumentTheme(), pv.themes.DarkTheme(), pv.themes.ParaViewTheme()]
         self.current_theme_index = 0
@@ -90,12 +92,7 @@ class Plot3D:
                 break
 
     def preprocess_image(self):
-        Z = self.img.astype(np.float32)
-        Z = (Z - Z.min()) / (Z.max() - Z.min())
-        Z = 1 - Z
-        Z = np.sqrt(Z)  # faster than np.power(Z, 0.5)
-        Z = GaussianFilter(sigma=1).apply(Z)
-        return Z
+        return self.pipeline.run(self.img)
 
     def create_grid(self, Z):
         y, x = np.mgrid[: Z.shape[0], : Z.shape[1]]
@@ -218,7 +215,7 @@ class Plot3D:
                 self.color_window.destroy()
                 self.color_window = None
             else:
-                tk.messagebox.showwarning("Invalid Color Selection", "Please select at least two different colors.")
+                messagebox.showwarning("Invalid Color Selection", "Please select at least two different colors.")
 
         button_frame = ttk.Frame(self.color_window)
         button_frame.pack(pady=10)
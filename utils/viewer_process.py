@@ -0,0 +1,180 @@
+import gc
+import multiprocessing as mp
+import os
+import queue
+from tkinter import messagebox
+from multiprocessing import shared_memory
+import numpy as np
+
+
+def viewer_worker(requests, errors):
+    try:
+        run_viewer(requests)
+    except Exception as e:
+        # stderr is discarded in windowed builds, let the main process report the failure
+        errors.put((os.getpid(), f"{type(e).__name__}: {e}"))
+        raise
+
+
+def run_viewer(requests):
+    # Importing pyvista/VTK is the slow part of opening a viewer, do it before the request arrives
+    import tkinter as tk
+    from utils.plotting import Plot3D
+
+    # Colour dialogs need a Tk root, keep it hidden so no empty window shows up
+    tk_root = tk.Tk()
+    tk_root.withdraw()
+
+    request = requests.get()
+    if request is None:
+        tk_root.destroy()
+        return
+
+    shm_name, shape, dtype, filename = request
+    shm = shared_memory.SharedMemory(name=shm_name)
+    img = plot = None
+    try:
+        img = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        plot = Plot3D(img, filename)
+        plot.show()
+    finally:
+        # The plotter's key callbacks keep the plot (and its view on the buffer) in a cycle
+        img = plot = None
+        gc.collect()
+        shm.close()
+        tk_root.destroy()
+
+
+class ViewerPool:
+    """
+    Open 3D viewers in separate processes so that the gallery stays usable.
+    One worker is always kept warm with pyvista already imported; each worker
+    serves a single viewer and exits when its window is closed. Images are
+    handed over through shared memory, which the pool releases once the
+    worker has exited.
+    """
+
+    def __init__(self, root, poll_interval=1000):
+        self.root = root
+        self.poll_interval = poll_interval
+        self.context = mp.get_context('spawn')
+        self.errors = self.context.Queue()  # (pid, message) of workers that failed
+        self.error_messages = {}
+        self.warm_worker = None
+        self.active = []  # (process, shared memory) pairs of open viewers
+        self._after_id = None
+
+    def start(self):
+        self.spawn_worker()
+        self.poll()
+
+    def spawn_worker(self):
+        requests = self.context.Queue()
+        process = self.context.Process(target=viewer_worker, args=(requests, self.errors), daemon=True)
+        process.start()
+        self.warm_worker = (process, requests)
+
+    def open(self, img, filename):
+        img = np.ascontiguousarray(img)
+        shm = shared_memory.SharedMemory(create=True, size=max(img.nbytes, 1))
+        np.ndarray(img.shape, dtype=img.dtype, buffer=shm.buf)[...] = img
+
+        if self.warm_worker is None or not self.warm_worker[0].is_alive():
+            self.spawn_worker()
+        process, requests = self.warm_worker
+
+        requests.put((shm.name, img.shape, img.dtype.str, filename))
+        self.active.append((process, shm))
+
+        # Get the next worker ready while this one is building its plot
+        self.spawn_worker()
+
+    def poll(self):
+        try:
+            self.collect_errors()
+
+            still_open = []
+            for process, shm in self.active:
+                if process.is_alive():
+                    still_open.append((process, shm))
+                else:
+                    process.join()
+                    self.release(shm)
+                    self.report_failure(process, "The 3D viewer failed")
+            self.active = still_open
+
+            # A warm worker that died before getting a request (e.g. pyvista failed to import)
+            # is reported once; the next click spawns a fresh one
+            if self.warm_worker is not None and not self.warm_worker[0].is_alive():
+                process = self.warm_worker[0]
+                process.join()
+                self.warm_worker = None
+                self.report_failure(process, "The 3D viewer could not be started")
+        finally:
+            self._after_id = self.root.after(self.poll_interval, self.poll)
+
+    def collect_errors(self):
+        while True:
+            try:
+                pid, message = self.errors.get_nowait()
+            except queue.Empty:
+                return
+            self.error_messages[pid] = message
+
+    def report_failure(self, process, title):
+        self.collect_errors()
+        message = self.error_messages.pop(process.pid, None)
+        if process.exitcode == 0 and message is None:
+            return
+        if message is None:
+            message = f"The viewer process exited with code {process.exitcode}."
+        messagebox.showerror("3D Model", f"{title}: {message}")
+
+    def release(self, shm):
+        shm.close()
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+    def shutdown(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+        if self.warm_worker is not None:
+            process, requests = self.warm_worker
+            requests.put(None)
+            process.join(timeout=1)
+            self.warm_worker = None
+
+        for process, shm in self.active:
+            process.terminate()
+            process.join()
+            self.release(shm)
+        self.active = []
+
+
+_viewer_pool = None
+
+
+def start_viewer_pool(root):
+    global _viewer_pool
+    _viewer_pool = ViewerPool(root)
+    _viewer_pool.start()
+
+
+def shutdown_viewer_pool():
+    global _viewer_pool
+    if _viewer_pool is not None:
+        _viewer_pool.shutdown()
+        _viewer_pool = None
+
+
+def open_3d_viewer(img, filename):
+    if _viewer_pool is None:
+        # No pool running (e.g. utils used as a library), fall back to the blocking viewer
+        from utils.plotting import show_3d_plot
+        show_3d_plot(img, filename)
+    else:
+        _viewer_pool.open(img, filename)
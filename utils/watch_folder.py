@@ -0,0 +1,189 @@
+import io
+import os
+import pandas as pd
+from tkinter import filedialog, messagebox
+from utils.file_operations import SUPPORTED_EXTENSIONS, IncrementalRaster, apply_hole_filling, check_columns, read_points
+
+
+class WatchedFile:
+    def __init__(self, path):
+        self.path = path
+        self.raster = IncrementalRaster()
+        self.offset = 0  # Byte offset of the first unread line
+        self.columns = None
+        self.mtime = None
+        self.size = None
+        self.inode = None
+        self.fingerprint = None  # Bytes already consumed, see read_fingerprint()
+        self.tile = None
+
+    def read_fingerprint(self):
+        """The start of the file and the bytes just before the offset, which an append leaves unchanged"""
+        with open(self.path, 'rb') as f:
+            head = f.read(min(self.offset, 1024))
+            f.seek(max(self.offset - 256, 0))
+            tail = f.read(min(self.offset, 256))
+        return head, tail
+
+    def is_replaced(self, stat):
+        """True when the file was rewritten or renamed over instead of appended to"""
+        if stat.st_size < self.offset or stat.st_ino != self.inode:
+            return True
+        return self.offset > 0 and self.read_fingerprint() != self.fingerprint
+
+    def title(self):
+        base_filename = os.path.splitext(os.path.basename(self.path))[0]
+        return f"{base_filename} ({self.raster.num_points} points)"
+
+
+class FolderWatcher:
+    """
+    Poll a directory and import new or changed files into the gallery.
+    CSV files are treated as append-only: only the rows written since the
+    last poll are read and drawn onto the existing raster. Any other format
+    and CSV files that were rewritten or replaced are imported again from
+    scratch.
+    """
+
+    def __init__(self, root, folder, interval=2000):
+        self.root = root
+        self.folder = folder
+        self.interval = interval
+        self.files = {}
+        self._after_id = None
+
+    def start(self):
+        self.poll()
+
+    def stop(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def is_running(self):
+        return self._after_id is not None
+
+    def poll(self):
+        try:
+            changed = self.scan()
+            if changed:
+                self.refresh_gallery(changed)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to update watched images: {str(e)}")
+        finally:
+            # Keep polling whatever happened, a single bad poll must not stop the watcher
+            self._after_id = self.root.after(self.interval, self.poll)
+
+    def scan(self):
+        changed = []
+        try:
+            names = sorted(os.listdir(self.folder))
+        except OSError:
+            return changed
+
+        for name in names:
+            path = os.path.join(self.folder, name)
+            if not name.endswith(SUPPORTED_EXTENSIONS) or not os.path.isfile(path):
+                continue
+
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue  # Renamed or deleted since the listing, e.g. a temporary file
+            watched = self.files.get(path)
+            if watched is not None and (watched.mtime, watched.size) == (stat.st_mtime, stat.st_size):
+                continue
+
+            try:
+                restart = watched is None or not name.endswith('.csv') or watched.is_replaced(stat)
+            except OSError:
+                continue  # Deleted while checking, picked up again if it comes back
+            if restart:
+                tile = watched.tile if watched is not None else None
+                watched = WatchedFile(path)
+                watched.tile = tile
+                self.files[path] = watched
+
+            # Remember the state even on failure so a broken file is not retried until it changes
+            watched.mtime, watched.size, watched.inode = stat.st_mtime, stat.st_size, stat.st_ino
+            try:
+                if self.read_new_points(watched, stat.st_size):
+                    changed.append(watched)
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to import '{name}': {str(e)}")
+            try:
+                watched.fingerprint = watched.read_fingerprint()
+            except OSError:
+                watched.fingerprint = None
+
+        return changed
+
+    def read_new_points(self, watched, size):
+        if watched.path.endswith('.csv'):
+            df = self.read_csv_tail(watched, size)
+            if df is None:
+                return False
+            check_columns(df.columns)
+            x, y, gray = df['X'].to_numpy(), df['Y'].to_numpy(), df['Grayscale'].to_numpy()
+        else:
+            x, y, gray = read_points(watched.path)
+
+        watched.raster.add_points(x, y, gray)
+        return watched.raster.img is not None
+
+    def read_csv_tail(self, watched, size):
+        with open(watched.path, 'rb') as f:
+            f.seek(watched.offset)
+            data = f.read(size - watched.offset)
+
+        # Only consume complete lines, a row still being written is picked up on the next poll
+        end = data.rfind(b'\n') + 1
+        if end == 0:
+            return None
+        data = data[:end]
+
+        if watched.columns is None:
+            header_end = data.find(b'\n') + 1
+            watched.columns = pd.read_csv(io.BytesIO(data[:header_end]), nrows=0).columns
+            data = data[header_end:]
+        watched.offset += end
+
+        if not data.strip():
+            return None
+        return pd.read_csv(io.BytesIO(data), header=None, names=watched.columns)
+
+    def refresh_gallery(self, changed):
+        from utils.gui import add_images, set_tile_image, update_root_images  # Import here to avoid circular import
+
+        # The raw raster keeps receiving points, gaps are only filled in the displayed copy
+        new_files = []
+        for watched in changed:
+            if watched.tile is not None and watched.tile.winfo_exists():
+                set_tile_image(watched.tile, apply_hole_filling(self.root, watched.raster.img), watched.title())
+            else:
+                new_files.append(watched)
+
+        if new_files:
+            tiles = add_images(self.root, [(apply_hole_filling(self.root, watched.raster.img), watched.title())
+                                           for watched in new_files])
+            for watched, tile in zip(new_files, tiles):
+                watched.tile = tile
+        else:
+            update_root_images(self.root)
+
+
+def toggle_watch_folder(root, watch_button):
+    watcher = getattr(root, 'folder_watcher', None)
+    if watcher is not None and watcher.is_running():
+        watcher.stop()
+        root.folder_watcher = None
+        watch_button.config(text="Watch Folder")
+        return
+
+    folder = filedialog.askdirectory(title="Select a folder to watch")
+    if not folder:
+        return
+
+    root.folder_watcher = FolderWatcher(root, folder)
+    root.folder_watcher.start()
+    watch_button.config(text="Stop Watching")
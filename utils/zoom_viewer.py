@@ -0,0 +1,199 @@
+import threading
+import tkinter as tk
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from PIL import Image, ImageTk
+
+TILE_SIZE = 256
+MAX_ZOOM_LEVEL = 4  # 16 screen pixels per image pixel
+MAX_CACHED_TILES = 512
+
+
+class ZoomViewer:
+    """
+    Zoom and pan a full resolution image. Only the tiles covering the visible
+    viewport are drawn; they are resampled for the current zoom level in
+    background threads and kept in an LRU cache.
+
+    Zoom level z shows the image at a scale of 2**z. Negative levels are cut
+    from a pyramid of half resolution copies, each box-reduced from the level
+    above, so zooming out never touches the full resolution array again.
+    Positive levels magnify with nearest neighbour so individual pixels stay
+    visible.
+    """
+
+    def __init__(self, root, img, filename, width=1024, height=768):
+        self.img = img
+        self.window = tk.Toplevel(root)
+        self.window.title(filename)
+        self.window.geometry(f"{width}x{height}")
+
+        self.status_label = tk.Label(self.window, anchor='w')
+        self.status_label.pack(side=tk.BOTTOM, fill=tk.X)
+        self.canvas = tk.Canvas(self.window, bg='#202020', highlightthickness=0)
+        self.canvas.pack(fill=tk.BOTH, expand=True)
+
+        self.executor = ThreadPoolExecutor(max_workers=2)
+        self.cache = OrderedDict()  # (level, tx, ty) -> PhotoImage, least recently used first
+        self.pending = {}  # (level, tx, ty) -> Future
+        self.items = {}  # (level, tx, ty) -> canvas item currently displayed
+        self.pyramid = {0: img}  # level -> image at that scale, built on demand for levels below 0
+        self.pyramid_lock = threading.RLock()  # level_image() recurses into the level above
+
+        # Start with the whole image fitted to the window
+        self.level = self.fit_level(width, height)
+        self.min_level = self.level
+        self.offset_x = 0  # Viewport origin in pixels of the current level
+        self.offset_y = 0
+        self.drag_start = None
+        self._poll_id = None
+
+        self.canvas.bind("<Enter>", lambda event: self.canvas.focus_set())  # Mouse wheel events go to the focused widget
+        self.canvas.bind("<ButtonPress-1>", self.start_drag)
+        self.canvas.bind("<B1-Motion>", self.drag)
+        self.canvas.bind("<MouseWheel>", self.on_mouse_wheel)
+        self.canvas.bind("<Button-4>", lambda event: self.zoom(1, event.x, event.y))
+        self.canvas.bind("<Button-5>", lambda event: self.zoom(-1, event.x, event.y))
+        self.canvas.bind("<Configure>", lambda event: self.redraw())
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+    def fit_level(self, width, height):
+        level = 0
+        img_height, img_width = self.img.shape[:2]
+        while level > -16 and (img_width * 2.0 ** level > width or img_height * 2.0 ** level > height):
+            level -= 1
+        return level
+
+    def level_size(self, level):
+        img_height, img_width = self.img.shape[:2]
+        scale = 2.0 ** level
+        return max(int(img_width * scale), 1), max(int(img_height * scale), 1)
+
+    def render_tile(self, level, tx, ty):
+        """Resample one tile, runs in a worker thread"""
+        level_width, level_height = self.level_size(level)
+        width = min(TILE_SIZE, level_width - tx * TILE_SIZE)
+        height = min(TILE_SIZE, level_height - ty * TILE_SIZE)
+
+        if level <= 0:
+            region = self.level_image(level)[ty * TILE_SIZE:ty * TILE_SIZE + height, tx * TILE_SIZE:tx * TILE_SIZE + width]
+            tile = Image.fromarray(region)
+        else:
+            factor = 2 ** level
+            top, left = ty * TILE_SIZE // factor, tx * TILE_SIZE // factor
+            region = self.img[top:top + -(-height // factor), left:left + -(-width // factor)]
+            tile = Image.fromarray(region).resize((region.shape[1] * factor, region.shape[0] * factor), Image.NEAREST)
+        return tile.crop((0, 0, width, height))
+
+    def level_image(self, level):
+        """Image for a level <= 0, halving the next level up when it has not been built yet"""
+        with self.pyramid_lock:
+            if level not in self.pyramid:
+                above = self.level_image(level + 1)
+                self.pyramid[level] = np.asarray(Image.fromarray(above).reduce(2))
+            return self.pyramid[level]
+
+    def visible_tiles(self):
+        level_width, level_height = self.level_size(self.level)
+        view_width, view_height = self.canvas.winfo_width(), self.canvas.winfo_height()
+        first_tx = max(self.offset_x // TILE_SIZE, 0)
+        first_ty = max(self.offset_y // TILE_SIZE, 0)
+        last_tx = min((self.offset_x + view_width - 1) // TILE_SIZE, (level_width - 1) // TILE_SIZE)
+        last_ty = min((self.offset_y + view_height - 1) // TILE_SIZE, (level_height - 1) // TILE_SIZE)
+        return [(self.level, tx, ty) for ty in range(first_ty, last_ty + 1) for tx in range(first_tx, last_tx + 1)]
+
+    def redraw(self):
+        visible = self.visible_tiles()
+        visible_set = set(visible)
+
+        for key in list(self.items):
+            if key not in visible_set:
+                self.canvas.delete(self.items.pop(key))
+
+        # Drop queued tiles that scrolled out of view or belong to another level,
+        # tiles already being rendered finish and go into the cache
+        for key in list(self.pending):
+            if key not in visible_set and self.pending[key].cancel():
+                del self.pending[key]
+
+        for key in visible:
+            level, tx, ty = key
+            x, y = tx * TILE_SIZE - self.offset_x, ty * TILE_SIZE - self.offset_y
+            if key in self.items:
+                self.canvas.coords(self.items[key], x, y)
+            elif key in self.cache:
+                self.cache.move_to_end(key)
+                self.items[key] = self.canvas.create_image(x, y, image=self.cache[key], anchor='nw')
+            elif key not in self.pending:
+                self.pending[key] = self.executor.submit(self.render_tile, *key)
+
+        if self.pending and self._poll_id is None:
+            self._poll_id = self.window.after(15, self.collect_tiles)
+
+        level_width, level_height = self.level_size(self.level)
+        self.status_label.config(text=f"Zoom: {2.0 ** self.level:g}x    Size at this zoom: {level_width}x{level_height}")
+
+    def collect_tiles(self):
+        self._poll_id = None
+        finished = [key for key, future in self.pending.items() if future.done()]
+        for key in finished:
+            future = self.pending.pop(key)
+            if future.exception() is not None:
+                continue
+            # PhotoImage must be created on the Tk thread
+            self.cache[key] = ImageTk.PhotoImage(future.result())
+
+        while len(self.cache) > MAX_CACHED_TILES:
+            key, _ = self.cache.popitem(last=False)
+            if key in self.items:
+                self.canvas.delete(self.items.pop(key))
+
+        self.redraw()
+
+    def start_drag(self, event):
+        self.drag_start = (event.x, event.y)
+
+    def drag(self, event):
+        if self.drag_start is None:
+            return
+        dx, dy = event.x - self.drag_start[0], event.y - self.drag_start[1]
+        self.drag_start = (event.x, event.y)
+        self.set_offset(self.offset_x - dx, self.offset_y - dy)
+        self.redraw()
+
+    def set_offset(self, x, y):
+        level_width, level_height = self.level_size(self.level)
+        max_x = max(level_width - self.canvas.winfo_width(), 0)
+        max_y = max(level_height - self.canvas.winfo_height(), 0)
+        self.offset_x = int(min(max(x, 0), max_x))
+        self.offset_y = int(min(max(y, 0), max_y))
+
+    def on_mouse_wheel(self, event):
+        self.zoom(1 if event.delta > 0 else -1, event.x, event.y)
+
+    def zoom(self, step, x, y):
+        level = min(max(self.level + step, self.min_level), MAX_ZOOM_LEVEL)
+        if level == self.level:
+            return
+
+        # Keep the image pixel under the cursor in place
+        factor = 2.0 ** (level - self.level)
+        self.level = level
+        self.set_offset((self.offset_x + x) * factor - x, (self.offset_y + y) * factor - y)
+
+        for item in self.items.values():
+            self.canvas.delete(item)
+        self.items = {}
+        self.redraw()
+
+    def close(self):
+        if self._poll_id is not None:
+            self.window.after_cancel(self._poll_id)
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.cache.clear()
+        self.window.destroy()
+
+
+def show_zoom_viewer(root, img, filename):
+    ZoomViewer(root, img, filename)